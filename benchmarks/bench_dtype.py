@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import numpy
+from symbolicdifferentiator import Parser
+from symbolicdifferentiator.evaluator import Evaluator, DTYPES
+"""
+Throughput and accuracy of Evaluator per dtype
+
+Every dtype evaluates f and f' on the same grid. The error is measured against
+numpy.longdouble and reported as the largest relative error over the points
+where the reference is finite.
+
+    python benchmarks/bench_dtype.py [points]
+"""
+SOURCES = ["sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "x^3-4x^2+2x-7", "tan(x)*cos(2x)+sec(x/5)"]
+
+#return: seconds per call of f, best of a few runs
+def timeit(f, repeat=3):
+    best = float("inf")
+    for i in range(0, repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def relativeError(result, reference):
+    valid = numpy.isfinite(reference)
+    reference = reference[valid]
+    difference = numpy.abs(result[valid].astype(numpy.clongdouble) - reference)
+    return float(numpy.max(difference / numpy.maximum(numpy.abs(reference), 1)))
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    xs = numpy.linspace(0.1, 10.0, points)
+    print("%-8s %-10s %14s %14s" % ("f", "dtype", "points/s", "max rel error"))
+    for source in SOURCES:
+        f = Parser(source, 'x').parse()
+        for name, expr in (("f", f), ("f'", f.derivative())):
+            reference = Evaluator(numpy.longdouble).evaluate(expr, xs)
+            print(source if name == "f" else "  " + name)
+            for dtype in DTYPES:
+                evaluator = Evaluator(dtype)
+                grid = xs.astype(dtype)
+                seconds = timeit(lambda: evaluator.evaluate(expr, grid))
+                error = relativeError(evaluator.evaluate(expr, grid), reference)
+                print("%-8s %-10s %14.3g %14.3g" % ("", dtype, points / seconds, error))
+            #the per point Python path that compute() takes
+            sample = xs[:min(points, 20000)].tolist()
+            seconds = timeit(lambda: [expr.compute(x) for x in sample], 1)
+            print("%-8s %-10s %14.3g %14s" % ("", "compute()", len(sample) / seconds, "-"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import time
+"""
+Import time of the package and of each optional subsystem
+
+Every case runs in a fresh interpreter. "process ms" is the wall time of the
+whole interpreter, start up and exit included, "import ms" only the case's
+code, and "modules" everything in sys.modules at the end. The first row runs
+nothing, so the others read as a cost over a bare interpreter.
+
+The rows marked [old] load what the flat layout loaded up front: its entry
+point, DerivativeGrapher.py, imported Tkinter, matplotlib and numpy, and
+Evaluator.py imported concurrent.futures, before any expression was parsed.
+The first needs matplotlib and prints n/a without it, the second leaves
+matplotlib out so there is an eager row on any machine with numpy.
+
+    python benchmarks/bench_import.py [runs]
+"""
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CASES = [
+    ("baseline: empty interpreter", "pass"),
+    ("core (import symbolicdifferentiator)", "import symbolicdifferentiator"),
+    ("core + differentiate a string",
+     "import symbolicdifferentiator as s; s.Parser('x^2+sin(x)','x').parse().derivative()"),
+    ("+ grid evaluation (numpy)",
+     "import symbolicdifferentiator as s; s.evaluateGrid(s.Parser('x^2','x').parse(), 0.0, 1.0, 10)"),
+    ("+ persistent cache (sqlite3)", "import symbolicdifferentiator as s; s.ExpressionCache"),
+    ("[old] grapher: Tkinter, matplotlib, numpy", "import symbolicdifferentiator.grapher"),
+    ("[old] same without matplotlib",
+     "import symbolicdifferentiator, tkinter, numpy, concurrent.futures"),
+]
+#print the seconds spent and the number of modules loaded at the end
+TEMPLATE = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            "%s\n"
+            "print(time.perf_counter() - start, len(sys.modules))\n")
+
+#return: (best process seconds, best import seconds, modules) or None if the code fails to import
+def measure(code, runs):
+    best = None
+    for i in range(0, runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", TEMPLATE % code], cwd=ROOT,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        process = time.perf_counter() - start
+        if result.returncode != 0:
+            return None
+        seconds, modules = result.stdout.split()
+        if best is None:
+            best = (process, float(seconds), int(modules))
+        else:
+            best = (min(best[0], process), min(best[1], float(seconds)), int(modules))
+    return best
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print("%-42s %12s %12s %10s" % ("case", "process ms", "import ms", "modules"))
+    for name, code in CASES:
+        result = measure(code, runs)
+        if result is None:
+            print("%-42s %12s %12s %10s" % (name, "n/a", "n/a", "n/a"))
+        else:
+            print("%-42s %12.2f %12.2f %10d" % (name, result[0] * 1000, result[1] * 1000, result[2]))
+
+if __name__ == "__main__":
+    main()
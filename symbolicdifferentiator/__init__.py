@@ -0,0 +1,40 @@
+"""
+Symbolic differentiation of math expressions
+
+Importing the package only loads the expression tree and the parser:
+
+    from symbolicdifferentiator import Parser
+    Parser("x^2+sin(x)", 'x').parse().derivative()
+
+The other subsystems pull in numpy, sqlite3 or Tkinter/matplotlib, so their
+names below are resolved the first time they are used.
+"""
+from .expression import (Expression, Constant, Variable, Plus, Minus, Multiply, Divide, E, Ln, Power,
+                         Sin, Cos, Tan, Cot, Sec, Csc, Derivative, simplify)
+from .parser import TokenStream, Parser, IncrementalParser, ParsingError, ParserError, insertMultiplication
+
+#name -> submodule that defines it, kept out of __all__ so "import *" stays light
+_lazy = {
+    "Evaluator": "evaluator", "evaluate": "evaluator", "evaluateGrid": "evaluator", "DTYPES": "evaluator",
+    "ChebyshevSurrogate": "approximation", "surrogate": "approximation", "ApproximationError": "approximation",
+    "ExpressionCache": "cache",
+    "Grapher": "grapher",
+}
+
+__all__ = ["Expression", "Constant", "Variable", "Plus", "Minus", "Multiply", "Divide", "E", "Ln", "Power",
+           "Sin", "Cos", "Tan", "Cot", "Sec", "Csc", "Derivative", "simplify",
+           "TokenStream", "Parser", "IncrementalParser", "ParsingError", "ParserError",
+           "insertMultiplication"]
+
+def __getattr__(name):
+    if name not in _lazy:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    import importlib
+    module = importlib.import_module("." + _lazy[name], __name__)
+    for n in _lazy:
+        if _lazy[n] == _lazy[name]:
+            globals()[n] = getattr(module, n)
+    return globals()[name]
+
+def __dir__():
+    return __all__ + sorted(_lazy)
@@ -0,0 +1,3 @@
+from .parser import main
+
+main()
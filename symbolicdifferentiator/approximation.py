@@ -0,0 +1,182 @@
+import bisect
+import math
+from collections import OrderedDict
+from .expression import *
+"""
+Piecewise Chebyshev surrogates of an Expression on a fixed interval
+
+A surrogate replaces the walk over the expression tree with the evaluation of
+a few low degree polynomials. It is built once for a given tolerance and then
+evaluated with the Clenshaw recurrence, which works on plain numbers and on
+numpy arrays alike.
+
+    s = surrogate(expr, -1.0, 1.0, 1e-10)
+    s.compute(0.5)           #a number
+    s.compute(numpy_array)   #an array, evaluated piece by piece
+    s.errorBound             #estimated max absolute error on [a,b]
+"""
+MIN_DEGREE = 16
+MAX_DEGREE = 128
+MAX_DEPTH = 10
+CACHE_SIZE = 128
+
+class ApproximationError(Exception):
+    pass
+
+#param: f = a function of one number, a,b = interval bounds, n = polynomial degree
+#return: the n+1 Chebyshev coefficients of the interpolant of f at the Chebyshev extrema
+def chebyshevCoefficients(f, a, b, n):
+    half = (b - a) / 2.0
+    middle = (b + a) / 2.0
+    values = []
+    for j in range(0, n + 1):
+        try:
+            values.append(float(f(middle + half * math.cos(math.pi * j / n))))
+        except (ValueError, ZeroDivisionError, OverflowError):
+            raise ApproximationError
+    if not all(map(_isFinite, values)):
+        raise ApproximationError
+    values[0] /= 2.0
+    values[n] /= 2.0
+    table = [math.cos(math.pi * i / n) for i in range(0, 2 * n)]
+    coefficients = []
+    for k in range(0, n + 1):
+        s = 0.0
+        for j in range(0, n + 1):
+            s += values[j] * table[(j * k) % (2 * n)]
+        coefficients.append(s * 2.0 / n)
+    coefficients[0] /= 2.0
+    coefficients[n] /= 2.0
+    return coefficients
+
+#param: coefficients = Chebyshev coefficients, t = a number or array in [-1,1]
+#return: the value of the Chebyshev series at t
+def clenshaw(coefficients, t):
+    b1 = 0.0
+    b2 = 0.0
+    for c in reversed(coefficients[1:]):
+        b1, b2 = 2 * t * b1 - b2 + c, b1
+    return t * b1 - b2 + coefficients[0]
+
+def _isFinite(v):
+    return not (math.isinf(v) or math.isnan(v))
+
+#fit a single piece, doubling the degree until the series has decayed below tolerance
+#return: (coefficients, error) or None if MAX_DEGREE is not enough
+def _fitPiece(f, a, b, tolerance):
+    n = MIN_DEGREE
+    while n <= MAX_DEGREE:
+        coefficients = chebyshevCoefficients(f, a, b, n)
+        #drop the tail whose total magnitude stays under half the tolerance
+        tail = 0.0
+        m = n
+        while m > 0 and tail + abs(coefficients[m]) <= tolerance / 2.0:
+            tail += abs(coefficients[m])
+            m -= 1
+        if m < n - 2:
+            coefficients = coefficients[:m + 1]
+            #check between the interpolation nodes, where aliasing shows up
+            observed = 0.0
+            for j in range(0, n):
+                t = math.cos(math.pi * (j + 0.5) / n)
+                try:
+                    exact = f((b + a) / 2.0 + (b - a) / 2.0 * t)
+                except (ValueError, ZeroDivisionError, OverflowError):
+                    raise ApproximationError
+                #max() would drop a nan and report a bound the piece does not meet
+                if not _isFinite(exact):
+                    raise ApproximationError
+                observed = max(observed, abs(exact - clenshaw(coefficients, t)))
+            error = max(tail, observed)
+            if error <= tolerance:
+                return (coefficients, error)
+        n *= 2
+    return None
+
+class ChebyshevSurrogate(Expression):
+
+    #param: expression = an Expression, a,b = interval bounds, tolerance = absolute error target
+    def __init__(self, expression, a, b, tolerance=1e-10):
+        assert isinstance(expression, Expression)
+        assert a < b
+        assert tolerance > 0
+        self.expression = expression
+        self.a = float(a)
+        self.b = float(b)
+        self.tolerance = tolerance
+        #breakpoints[i], breakpoints[i+1] bound pieces[i]
+        self.breakpoints = [self.a]
+        self.pieces = []
+        self.errors = []
+        self.__build(self.a, self.b, 0)
+
+    def __build(self, a, b, depth):
+        fit = _fitPiece(self.expression.compute, a, b, self.tolerance)
+        if fit:
+            self.breakpoints.append(b)
+            self.pieces.append(fit[0])
+            self.errors.append(fit[1])
+        elif depth < MAX_DEPTH:
+            middle = (a + b) / 2.0
+            self.__build(a, middle, depth + 1)
+            self.__build(middle, b, depth + 1)
+        else:
+            raise ApproximationError
+
+    #return: the estimated max absolute error over the whole interval
+    @property
+    def errorBound(self):
+        return max(self.errors)
+
+    def __evaluatePiece(self, i, x):
+        a = self.breakpoints[i]
+        b = self.breakpoints[i + 1]
+        return clenshaw(self.pieces[i], (2 * x - (a + b)) / (b - a))
+
+    #fits the forward-mode derivative, the symbolic tree takes ln of bases that can be negative
+    def derivative(self):
+        return surrogate(Derivative(self.expression), self.a, self.b, self.tolerance)
+
+    #param: x = a number or a numpy array inside [a,b]
+    def compute(self, x):
+        if hasattr(x, "shape"):
+            import numpy
+            x = numpy.asarray(x, dtype=float)
+            if x.size and (x.min() < self.a or x.max() > self.b):
+                raise ValueError("outside of the approximation interval")
+            indices = numpy.searchsorted(self.breakpoints, x, side="right") - 1
+            indices = numpy.clip(indices, 0, len(self.pieces) - 1)
+            result = numpy.empty_like(x)
+            for i in numpy.unique(indices):
+                mask = indices == i
+                result[mask] = self.__evaluatePiece(i, x[mask])
+            return result
+        if x < self.a or x > self.b:
+            raise ValueError("outside of the approximation interval")
+        i = min(bisect.bisect_right(self.breakpoints, x) - 1, len(self.pieces) - 1)
+        return self.__evaluatePiece(i, x)
+
+    def __str__(self):
+        return "(chebyshev[" + str(self.a) + "," + str(self.b) + "] " + self.expression.__str__() + ")"
+
+    def __eq__(self, other):
+        return (isinstance(other, ChebyshevSurrogate) and self.expression == other.expression
+                and self.a == other.a and self.b == other.b and self.tolerance == other.tolerance)
+
+_cache = OrderedDict()
+
+#param: expression = an Expression, a,b = interval bounds, tolerance = absolute error target
+#return: a ChebyshevSurrogate, shared with earlier calls for the same arguments
+def surrogate(expression, a, b, tolerance=1e-10):
+    key = (str(expression), float(a), float(b), tolerance)
+    if key in _cache:
+        s = _cache.pop(key)
+    else:
+        s = ChebyshevSurrogate(expression, a, b, tolerance)
+        if len(_cache) >= CACHE_SIZE:
+            _cache.popitem(last=False)
+    _cache[key] = s
+    return s
+
+def clearCache():
+    _cache.clear()
@@ -0,0 +1,177 @@
+import json
+import os
+import sqlite3
+import time
+from .parser import *
+"""
+On-disk cache of parsed expressions and their derivatives, shared by every
+process on the machine that opens the same file.
+
+Entries are keyed by the normalized input (the TokenStream string: whitespace
+stripped, implicit '*' inserted) and the variable, so "2x" and "2 * x" share
+an entry. Both trees are stored in a compact JSON form:
+
+    Constant  -> the number
+    Variable  -> the character
+    any other -> [tag, child, ...]
+
+The file is an sqlite database in WAL mode, which lets many readers and one
+writer work at the same time. When it holds more than maxEntries entries the
+least recently used ones are evicted. The number of entries is kept in its
+own one row table, so a write never has to count the entries table. A hit only
+writes its use time back when the stored one is older than REFRESH seconds, so
+reads of a hot entry stay reads.
+
+    with ExpressionCache(path) as cache:
+        expression, derivative = cache.parse("x^2+sin(x)", 'x')
+"""
+#seconds a hit may be stale before get() writes its use time again
+REFRESH = 60.0
+_tags = {Plus: "+", Minus: "-", Multiply: "*", Divide: "/", Power: "^", E: "e", Ln: "ln",
+         Sin: "sin", Cos: "cos", Tan: "tan", Cot: "cot", Sec: "sec", Csc: "csc"}
+_classes = dict((tag, cls) for cls, tag in _tags.items())
+
+#param: expr = an Expression
+#return: a structure of lists, strings and numbers that json can store
+def encode(expr):
+    if isinstance(expr, Constant):
+        return expr.value
+    elif isinstance(expr, Variable):
+        return expr.value
+    elif isinstance(expr, Derivative):
+        return encode(expr.expand())
+    elif isinstance(expr, (Plus, Minus, Multiply, Divide)):
+        return [_tags[type(expr)], encode(expr.left), encode(expr.right)]
+    elif isinstance(expr, Power):
+        return [_tags[Power], encode(expr.base), encode(expr.exponent)]
+    elif isinstance(expr, E):
+        return [_tags[E], encode(expr.exponent)]
+    elif isinstance(expr, Ln):
+        return [_tags[Ln], encode(expr.argument)]
+    elif type(expr) in _tags:
+        return [_tags[type(expr)], encode(expr.expression)]
+    else:
+        raise ValueError("cannot encode " + type(expr).__name__)
+
+#param: data = the output of encode
+#return: an Expression
+def decode(data):
+    if isinstance(data, list):
+        return _classes[data[0]](*[decode(d) for d in data[1:]])
+    elif isinstance(data, str):
+        return Variable(data)
+    else:
+        return Constant(data)
+
+#param: source = a string, v = a character
+#return: the string the parser actually reads
+def normalize(source, v):
+    return str(Parser(source, v))
+
+class ExpressionCache:
+
+    #param: path = the database file, maxEntries = how many entries to keep
+    def __init__(self, path, maxEntries=10000):
+        assert maxEntries > 0
+        self.path = path
+        self.maxEntries = maxEntries
+        self.__connection = None
+        self.__pid = None
+
+    #a connection must not cross a fork, so each process opens its own
+    def __connect(self):
+        if self.__pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            #with WAL a commit no longer waits for the disk, a crash can only lose the last ones
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (source TEXT NOT NULL, variable TEXT NOT NULL,"
+                               " expression TEXT NOT NULL, derivative TEXT NOT NULL, used REAL NOT NULL,"
+                               " PRIMARY KEY (source, variable))")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            connection.execute("CREATE TABLE IF NOT EXISTS size (id INTEGER PRIMARY KEY CHECK (id = 0),"
+                               " entries INTEGER NOT NULL)")
+            #counted once, when the file is created or comes from a version without the table
+            connection.execute("INSERT OR IGNORE INTO size SELECT 0, COUNT(*) FROM entries")
+            self.__connection = connection
+            self.__pid = os.getpid()
+        return self.__connection
+
+    #param: source = a string, v = a character
+    #return: (expression, derivative) or None when the input is not cached
+    def get(self, source, v):
+        key = normalize(source, v)
+        connection = self.__connect()
+        row = connection.execute("SELECT expression, derivative, used FROM entries WHERE source = ? AND variable = ?",
+                                 (key, v)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] > REFRESH:
+            connection.execute("UPDATE entries SET used = ? WHERE source = ? AND variable = ?", (now, key, v))
+        return (decode(json.loads(row[0])), decode(json.loads(row[1])))
+
+    #param: source = a string, v = a character, expression, derivative = Expressions
+    def put(self, source, v, expression, derivative):
+        key = normalize(source, v)
+        compact = (',', ':')
+        #encode before taking the write lock, it can be slow and can raise
+        expression = json.dumps(encode(expression), separators=compact)
+        derivative = json.dumps(encode(derivative), separators=compact)
+        connection = self.__connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            updated = connection.execute("UPDATE entries SET expression = ?, derivative = ?, used = ?"
+                                         " WHERE source = ? AND variable = ?",
+                                         (expression, derivative, time.time(), key, v)).rowcount
+            if not updated:
+                connection.execute("INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                                   (key, v, expression, derivative, time.time()))
+                connection.execute("UPDATE size SET entries = entries + 1")
+                extra = connection.execute("SELECT entries FROM size").fetchone()[0] - self.maxEntries
+                if extra > 0:
+                    evicted = connection.execute("DELETE FROM entries WHERE rowid IN"
+                                                 " (SELECT rowid FROM entries ORDER BY used LIMIT ?)",
+                                                 (extra,)).rowcount
+                    connection.execute("UPDATE size SET entries = entries - ?", (evicted,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    #param: source = a string, v = a character
+    #return: (expression, derivative), from the cache when another process already computed them
+    def parse(self, source, v):
+        result = self.get(source, v)
+        if result is None:
+            expression = Parser(source, v).parse()
+            result = (expression, expression.derivative())
+            self.put(source, v, result[0], result[1])
+        return result
+
+    def clear(self):
+        connection = self.__connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM entries")
+            connection.execute("UPDATE size SET entries = 0")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def __len__(self):
+        return self.__connect().execute("SELECT entries FROM size").fetchone()[0]
+
+    #close this process's connection, a later call opens a new one
+    def close(self):
+        if self.__connection is not None and self.__pid == os.getpid():
+            self.__connection.close()
+        self.__connection = None
+        self.__pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
@@ -0,0 +1,222 @@
+import cmath
+import math
+import os
+from .expression import *
+"""
+Evaluation of an Expression in a chosen numeric type
+
+compute() always works in Python floats. An Evaluator walks the same tree but
+takes every operation from a backend that matches the dtype:
+
+    "float64"    math,  for plain numbers (same results as compute)
+    "complex128" cmath, for plain numbers, so ln and ^ of negatives are defined
+    anything else, or x given as an array: numpy with that dtype,
+                 e.g. "float32" to halve the memory traffic of large grids
+
+A Derivative node is evaluated in forward mode, value and slope together, the
+way Derivative.compute() does it, so its derivative tree is never built.
+
+The math and cmath backends raise ValueError/ZeroDivisionError like compute().
+The numpy backend never raises for a bad point, it gives nan or inf there.
+"""
+DTYPES = ("float32", "float64", "complex64", "complex128")
+_aliases = {"float": "float64", "complex": "complex128"}
+
+class _Backend:
+
+    #param: where = numpy.where for backends that work on arrays, None otherwise
+    def __init__(self, number, sin, cos, tan, exp, log, power, divide, where=None):
+        self.number = number
+        self.sin = sin
+        self.cos = cos
+        self.tan = tan
+        self.exp = exp
+        self.log = log
+        self.power = power
+        self.divide = divide
+        self.where = where
+
+_math = _Backend(float, math.sin, math.cos, math.tan, lambda v: math.pow(math.e, v), math.log,
+                 math.pow, lambda a, b: a / float(b))
+_cmath = _Backend(complex, cmath.sin, cmath.cos, cmath.tan, cmath.exp, cmath.log,
+                  lambda a, b: a ** b, lambda a, b: a / complex(b))
+
+def _numpyBackend(dtype):
+    import numpy
+    number = numpy.dtype(dtype).type
+    return _Backend(number, numpy.sin, numpy.cos, numpy.tan, numpy.exp, numpy.log,
+                    numpy.power, numpy.divide, numpy.where)
+
+class Evaluator:
+
+    #param: dtype = a numpy float or complex dtype name, e.g. one of DTYPES
+    def __init__(self, dtype="float64"):
+        self.dtype = _aliases.get(dtype, dtype)
+        if self.dtype not in ("float64", "complex128"):
+            import numpy
+            if numpy.dtype(self.dtype).kind not in "fc":
+                raise ValueError("not a float or complex dtype: " + str(dtype))
+        self.__numpy = None
+
+    #param: expr = an Expression, x = a number or an array of numbers
+    #return: the value of expr at x in self.dtype
+    def evaluate(self, expr, x):
+        if self.dtype == "float64" and not hasattr(x, "__len__") and not hasattr(x, "shape"):
+            return self.__evaluate(_math, expr, float(x))
+        if self.dtype == "complex128" and not hasattr(x, "__len__") and not hasattr(x, "shape"):
+            return self.__evaluate(_cmath, expr, complex(x))
+        import numpy
+        if self.__numpy is None:
+            self.__numpy = _numpyBackend(self.dtype)
+        x = numpy.asarray(x, dtype=self.dtype)
+        with numpy.errstate(all="ignore"):
+            result = self.__evaluate(self.__numpy, expr, x)
+        #a tree without the variable gives a single number
+        if numpy.ndim(result) < x.ndim:
+            result = numpy.full(x.shape, result, dtype=self.dtype)
+        return result
+
+    def __evaluate(self, backend, expr, x):
+        if isinstance(expr, Constant):
+            return backend.number(expr.value)
+        elif isinstance(expr, Variable):
+            return x
+        elif isinstance(expr, Plus):
+            return self.__evaluate(backend, expr.left, x) + self.__evaluate(backend, expr.right, x)
+        elif isinstance(expr, Minus):
+            return self.__evaluate(backend, expr.left, x) - self.__evaluate(backend, expr.right, x)
+        elif isinstance(expr, Multiply):
+            return self.__evaluate(backend, expr.left, x) * self.__evaluate(backend, expr.right, x)
+        elif isinstance(expr, Divide):
+            return backend.divide(self.__evaluate(backend, expr.left, x), self.__evaluate(backend, expr.right, x))
+        elif isinstance(expr, E):
+            return backend.exp(self.__evaluate(backend, expr.exponent, x))
+        elif isinstance(expr, Ln):
+            return backend.log(self.__evaluate(backend, expr.argument, x))
+        elif isinstance(expr, Power):
+            return backend.power(self.__evaluate(backend, expr.base, x), self.__evaluate(backend, expr.exponent, x))
+        elif isinstance(expr, Sin):
+            return backend.sin(self.__evaluate(backend, expr.expression, x))
+        elif isinstance(expr, Cos):
+            return backend.cos(self.__evaluate(backend, expr.expression, x))
+        elif isinstance(expr, Tan):
+            return backend.tan(self.__evaluate(backend, expr.expression, x))
+        elif isinstance(expr, Cot):
+            return backend.divide(backend.number(1), backend.tan(self.__evaluate(backend, expr.expression, x)))
+        elif isinstance(expr, Sec):
+            return backend.divide(backend.number(1), backend.cos(self.__evaluate(backend, expr.expression, x)))
+        elif isinstance(expr, Csc):
+            return backend.divide(backend.number(1), backend.sin(self.__evaluate(backend, expr.expression, x)))
+        elif isinstance(expr, Derivative):
+            return self.__evaluateDerivative(backend, expr.expression, x)[1]
+        else:
+            #nodes without a tree to walk (e.g. surrogates) only know compute()
+            return backend.number(expr.compute(x))
+
+    #the same chain rule as computeDerivative() in expression.py, with the backend's operations
+    #return: (value, slope) of expr at x
+    def __evaluateDerivative(self, backend, expr, x):
+        one = backend.number(1)
+        if isinstance(expr, Constant):
+            return (backend.number(expr.value), backend.number(0))
+        elif isinstance(expr, Variable):
+            return (x, one)
+        elif isinstance(expr, (Plus, Minus, Multiply, Divide)):
+            left, dleft = self.__evaluateDerivative(backend, expr.left, x)
+            right, dright = self.__evaluateDerivative(backend, expr.right, x)
+            if isinstance(expr, Plus):
+                return (left + right, dleft + dright)
+            elif isinstance(expr, Minus):
+                return (left - right, dleft - dright)
+            elif isinstance(expr, Multiply):
+                return (left * right, dleft * right + left * dright)
+            else:
+                return (backend.divide(left, right), backend.divide(dleft * right - left * dright, right * right))
+        elif isinstance(expr, E):
+            exponent, dexponent = self.__evaluateDerivative(backend, expr.exponent, x)
+            value = backend.exp(exponent)
+            return (value, dexponent * value)
+        elif isinstance(expr, Ln):
+            argument, dargument = self.__evaluateDerivative(backend, expr.argument, x)
+            return (backend.log(argument), backend.divide(dargument, argument))
+        elif isinstance(expr, Power):
+            base, dbase = self.__evaluateDerivative(backend, expr.base, x)
+            exponent, dexponent = self.__evaluateDerivative(backend, expr.exponent, x)
+            value = backend.power(base, exponent)
+            powerRule = lambda: exponent * backend.power(base, exponent - one) * dbase
+            general = lambda: value * (dexponent * backend.log(base) + backend.divide(exponent * dbase, base))
+            if getattr(dexponent, "ndim", 0) == 0:
+                return (value, powerRule() if dexponent == 0 else general())
+            #the power rule wherever the exponent does not change, as for a single number
+            return (value, backend.where(dexponent == 0, powerRule(), general()))
+        elif isinstance(expr, (Sin, Cos, Tan, Cot, Sec, Csc)):
+            expression, dexpression = self.__evaluateDerivative(backend, expr.expression, x)
+            if isinstance(expr, Sin):
+                return (backend.sin(expression), dexpression * backend.cos(expression))
+            elif isinstance(expr, Cos):
+                return (backend.cos(expression), -dexpression * backend.sin(expression))
+            elif isinstance(expr, Tan):
+                sec = backend.divide(one, backend.cos(expression))
+                return (backend.tan(expression), dexpression * sec * sec)
+            elif isinstance(expr, Cot):
+                csc = backend.divide(one, backend.sin(expression))
+                return (backend.divide(one, backend.tan(expression)), -dexpression * csc * csc)
+            elif isinstance(expr, Sec):
+                sec = backend.divide(one, backend.cos(expression))
+                return (sec, dexpression * sec * backend.tan(expression))
+            else:
+                csc = backend.divide(one, backend.sin(expression))
+                return (csc, backend.divide(-dexpression * csc, backend.tan(expression)))
+        elif isinstance(expr, Derivative):
+            return (self.__evaluateDerivative(backend, expr.expression, x)[1],
+                    self.__evaluateDerivative(backend, expr.expand(), x)[1])
+        else:
+            return (self.__evaluate(backend, expr, x), backend.number(expr.derivative().compute(x)))
+
+_evaluators = {}
+
+#param: expr = an Expression, x = a number or an array, dtype = see Evaluator
+def evaluate(expr, x, dtype="float64"):
+    if dtype not in _evaluators:
+        _evaluators[dtype] = Evaluator(dtype)
+    return _evaluators[dtype].evaluate(expr, x)
+
+#param: expr = an Expression, start, stop = first and last grid point, num = number of points,
+#       dtype = see Evaluator, out = an array of num values or the path of a .npy file to map,
+#       mask = a bool array of num values, chunk = points per task, workers = number of threads
+#return: (out, mask), mask is True where out holds a finite value
+def evaluateGrid(expr, start, stop, num, dtype="float64", out=None, mask=None, chunk=1 << 16, workers=None):
+    from concurrent.futures import ThreadPoolExecutor
+    import numpy
+    evaluator = Evaluator(dtype)
+    if out is None:
+        out = numpy.empty(num, dtype=evaluator.dtype)
+    elif isinstance(out, str):
+        out = numpy.lib.format.open_memmap(out, mode="w+", dtype=evaluator.dtype, shape=(num,))
+    if mask is None:
+        mask = numpy.empty(num, dtype=bool)
+    if len(out) != num or len(mask) != num:
+        raise ValueError("out and mask need " + str(num) + " values, got "
+                         + str(len(out)) + " and " + str(len(mask)))
+    #numpy would cast silently on assignment, e.g. drop the imaginary part into a float array
+    if out.dtype != evaluator.dtype:
+        raise ValueError("out has dtype " + str(out.dtype) + ", expected " + str(numpy.dtype(evaluator.dtype)))
+    if mask.dtype != bool:
+        raise ValueError("mask has dtype " + str(mask.dtype) + ", expected bool")
+    step = (stop - start) / float(num - 1) if num > 1 else 0.0
+    
+    #numpy releases the GIL inside each operation, so chunks run in parallel
+    def evaluateChunk(low):
+        high = min(low + chunk, num)
+        xs = numpy.arange(low, high, dtype=numpy.float64) * step + start
+        ys = evaluator.evaluate(expr, xs)
+        out[low:high] = ys
+        mask[low:high] = numpy.isfinite(ys)
+    
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for result in pool.map(evaluateChunk, range(0, num, chunk)):
+            pass
+    #a memmap, write the pages back to its file
+    if hasattr(out, "flush"):
+        out.flush()
+    return (out, mask)
@@ -19,7 +19,7 @@ type Expression = Constant
                   Cot      Expression
                   Sec      Expression
                   Csc      Expression
-
+                  Derivative Expression
                   
 """
 # base class for all expressions
@@ -37,6 +37,11 @@ class Expression (object):
     def compute(self,x):
         pass
     
+    #param: x = a number
+    #return: (value, value of the derivative) at x, without building the derivative
+    def computeDerivative(self,x):
+        return (self.compute(x), self.derivative().compute(x))
+    
     #return: a string
     @abstractmethod
     def __str__(self):
@@ -50,9 +55,34 @@ class Expression (object):
     def __ne__(self,other):
         return not self.__eq__(other)
 
+#cache the result of derivative() on the node, expressions are not mutated once built
+#the result is already simplified, so simplify() of a larger tree stops at it
+#note: this sets _derivative on the node and simplified on the result, both may be
+#nodes of a tree the caller built and keeps using
+def memoized(derivative):
+    def wrapper(self):
+        try:
+            return self._derivative
+        except AttributeError:
+            self._derivative = derivative(self)
+            self._derivative.simplified = True
+            return self._derivative
+    return wrapper
+
+#simplified nodes are marked, so later calls stop there instead of walking the subtree again
+#note: the mark is an attribute simplified = True set on the returned node, which is expr
+#itself or nodes of it when nothing needed rewriting
 def simplify(expr):
     assert isinstance(expr,Expression)
-    
+    if getattr(expr,"simplified",False):
+        return expr
+    result = rewrite(expr)
+    result.simplified = True
+    return result
+
+#one bottom up pass of the rules of simplify
+#return: expr itself when nothing below it changed, so it keeps its memoized derivative
+def rewrite(expr):
     if isinstance(expr,Constant):
         return expr
     elif isinstance(expr,Variable):
@@ -67,6 +97,8 @@ def simplify(expr):
             return right
         elif right == Constant(0):
             return left
+        elif left is expr.left and right is expr.right:
+            return expr
         else:
             return Plus(left, right)
     
@@ -79,7 +111,10 @@ def simplify(expr):
         elif right == Constant(0):
             return left
         elif left == Constant(0):
-            return Multiply(Constant(-1), right)
+            #simplified too, so 0-1 gives -1 and not (-1*1) whether or not it sits in a larger tree
+            return simplify(Multiply(Constant(-1), right))
+        elif left is expr.left and right is expr.right:
+            return expr
         else:
             return Minus(left,right)
         
@@ -93,6 +128,8 @@ def simplify(expr):
             return right
         elif right == Constant(1):
             return left
+        elif left is expr.left and right is expr.right:
+            return expr
         else:
             return Multiply(left, right)
         
@@ -104,6 +141,8 @@ def simplify(expr):
             return Constant(0)
         elif left == right:
             return Constant(1)
+        elif left is expr.left and right is expr.right:
+            return expr
         else:
             return Divide(left, right)
         
@@ -119,6 +158,8 @@ def simplify(expr):
             return Constant(1)
         elif exponent == Constant(1):
             return base
+        elif base is expr.base and exponent is expr.exponent:
+            return expr
         else:
             return Power(base, exponent)
         
@@ -128,6 +169,8 @@ def simplify(expr):
             return Constant(1)
         elif isinstance(exponent,Ln):
             return exponent.argument
+        elif exponent is expr.exponent:
+            return expr
         else:
             return E(exponent)
     elif isinstance(expr,Ln):
@@ -136,12 +179,16 @@ def simplify(expr):
             return Constant(0)
         elif isinstance(argument,E):
             return argument.exponent
+        elif argument is expr.argument:
+            return expr
         else:
             return Ln(argument)
-    else:
+    elif isinstance(expr,(Sin,Cos,Tan,Cot,Sec,Csc)):
         #Trig functions
         expression = simplify(expr.expression)
-        if isinstance(expr,Sin):
+        if expression is expr.expression:
+            return expr
+        elif isinstance(expr,Sin):
             return Sin(expression)
         elif isinstance(expr,Cos):
             return Cos(expression)
@@ -153,6 +200,9 @@ def simplify(expr):
             return Sec(expression)
         elif isinstance(expr,Csc):
             return Csc(expression)
+    else:
+        #expressions with no rewrite rules (e.g. approximations)
+        return expr
         
 class Constant(Expression):
     
@@ -161,12 +211,16 @@ class Constant(Expression):
         assert isinstance(n, numbers.Number)
         self.value = n
         
+    @memoized
     def derivative(self):
         return Constant(0)
     
     def compute(self, x):
         return self.value
     
+    def computeDerivative(self, x):
+        return (self.value, 0)
+    
     def __str__(self):
         return str(self.value)
     
@@ -182,12 +236,16 @@ class Variable(Expression):
         assert len(v) == 1
         self.value = v
         
+    @memoized
     def derivative(self):
         return Constant(1)
     
     def compute(self, x):
         return x
     
+    def computeDerivative(self, x):
+        return (x, 1)
+    
     def __str__(self):
         return self.value
     
@@ -203,6 +261,7 @@ class Plus(Expression):
         self.left = left
         self.right = right
         
+    @memoized
     def derivative(self):
         left = self.left.derivative()
         right = self.right.derivative()
@@ -211,6 +270,11 @@ class Plus(Expression):
     def compute(self, x):
         return self.left.compute(x) + self.right.compute(x)
     
+    def computeDerivative(self, x):
+        left, dleft = self.left.computeDerivative(x)
+        right, dright = self.right.computeDerivative(x)
+        return (left + right, dleft + dright)
+    
     def __str__(self):
         return "(" + self.left.__str__() + "+" + self.right.__str__() + ")"
     
@@ -226,6 +290,7 @@ class Minus(Expression):
         self.left = left
         self.right = right
         
+    @memoized
     def derivative(self):
         left = self.left.derivative()
         right = self.right.derivative()
@@ -234,6 +299,11 @@ class Minus(Expression):
     def compute(self, x):
         return self.left.compute(x) - self.right.compute(x)
     
+    def computeDerivative(self, x):
+        left, dleft = self.left.computeDerivative(x)
+        right, dright = self.right.computeDerivative(x)
+        return (left - right, dleft - dright)
+    
     def __str__(self):
         return "(" + self.left.__str__() + "-" + self.right.__str__() + ")"
     
@@ -249,6 +319,7 @@ class Multiply(Expression):
         self.left = left
         self.right = right
         
+    @memoized
     def derivative(self):
         left = Multiply(self.left.derivative() , self.right)
         right =  Multiply(self.left , self.right.derivative())
@@ -257,6 +328,11 @@ class Multiply(Expression):
     def compute(self, x):
         return self.left.compute(x) * self.right.compute(x)
     
+    def computeDerivative(self, x):
+        left, dleft = self.left.computeDerivative(x)
+        right, dright = self.right.computeDerivative(x)
+        return (left * right, dleft * right + left * dright)
+    
     def __str__(self):
         return "(" + self.left.__str__() + "*" + self.right.__str__() + ")"
     
@@ -272,6 +348,7 @@ class Divide(Expression):
         self.left = left
         self.right = right
         
+    @memoized
     def derivative(self):
         #general case
         left = Multiply(self.left.derivative() , self.right)
@@ -283,6 +360,11 @@ class Divide(Expression):
     def compute(self, x):
         return self.left.compute(x) / float(self.right.compute(x))
     
+    def computeDerivative(self, x):
+        left, dleft = self.left.computeDerivative(x)
+        right, dright = self.right.computeDerivative(x)
+        return (left / float(right), (dleft * right - left * dright) / float(right * right))
+    
     def __str__(self):
         return "(" + self.left.__str__() + "/" + self.right.__str__() + ")"
     
@@ -296,6 +378,7 @@ class E(Expression):
         assert isinstance(exponent,Expression)
         self.exponent = exponent
     
+    @memoized
     def derivative(self):
         if isinstance(self.exponent,Ln):
             return simplify(self.exponent.argument.derivative())
@@ -305,6 +388,11 @@ class E(Expression):
     def compute(self, x):
         return math.pow(math.e,self.exponent.compute(x))
     
+    def computeDerivative(self, x):
+        exponent, dexponent = self.exponent.computeDerivative(x)
+        value = math.pow(math.e,exponent)
+        return (value, dexponent * value)
+    
     def __str__(self):
         return "(e^" + self.exponent.__str__() + ")"
     
@@ -318,6 +406,7 @@ class Ln(Expression):
         assert isinstance(argument,Expression)
         self.argument = argument
     
+    @memoized
     def derivative(self):
         if isinstance(self.argument,E):
             return simplify(self.argument.exponent.derivative())
@@ -327,6 +416,10 @@ class Ln(Expression):
     def compute(self, x):
         return math.log(self.argument.compute(x))
     
+    def computeDerivative(self, x):
+        argument, dargument = self.argument.computeDerivative(x)
+        return (math.log(argument), dargument / float(argument))
+    
     def __str__(self):
         return "(ln " + self.argument.__str__() + ")"
     
@@ -342,6 +435,7 @@ class Power(Expression):
         self.base = base
         self.exponent = exponent
         
+    @memoized
     def derivative(self):
         #Power rule
         if isinstance(self.base,Variable) and isinstance(self.exponent,Constant):
@@ -352,6 +446,15 @@ class Power(Expression):
     def compute(self, x):
         return math.pow(self.base.compute(x), self.exponent.compute(x))
     
+    def computeDerivative(self, x):
+        base, dbase = self.base.computeDerivative(x)
+        exponent, dexponent = self.exponent.computeDerivative(x)
+        value = math.pow(base, exponent)
+        #Power rule
+        if dexponent == 0:
+            return (value, exponent * math.pow(base, exponent - 1) * dbase)
+        return (value, value * (dexponent * math.log(base) + exponent * dbase / float(base)))
+    
     def __str__(self):
         return "(" + self.base.__str__() + "^" + self.exponent.__str__() + ")"
     
@@ -365,12 +468,17 @@ class Sin(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Cos(self.expression)))
     
     def compute(self, x):
         return math.sin(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        return (math.sin(expression), dexpression * math.cos(expression))
+    
     def __str__(self):
         return "(sin " + self.expression.__str__() + ")"
     
@@ -384,12 +492,17 @@ class Cos(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Multiply(Constant(-1),Sin(self.expression))))
     
     def compute(self, x):
         return math.cos(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        return (math.cos(expression), -dexpression * math.sin(expression))
+    
     def __str__(self):
         return "(cos " + self.expression.__str__() + ")"
     
@@ -403,12 +516,18 @@ class Tan(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Power(Sec(self.expression),Constant(2))))
     
     def compute(self, x):
         return math.tan(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        sec = 1 / math.cos(expression)
+        return (math.tan(expression), dexpression * sec * sec)
+    
     def __str__(self):
         return "(tan " + self.expression.__str__() + ")" 
     
@@ -422,12 +541,18 @@ class Cot(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Multiply(Constant(-1),Power(Csc(self.expression),Constant(2)))))
     
     def compute(self, x):
         return 1 / math.tan(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        csc = 1 / math.sin(expression)
+        return (1 / math.tan(expression), -dexpression * csc * csc)
+    
     def __str__(self):
         return "(cot " + self.expression.__str__() + ")"
     
@@ -441,12 +566,18 @@ class Sec(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Multiply(self,Tan(self.expression))))
     
     def compute(self, x):
         return 1 / math.cos(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        sec = 1 / math.cos(expression)
+        return (sec, dexpression * sec * math.tan(expression))
+    
     def __str__(self):
         return "(sec " + self.expression.__str__() + ")"
     
@@ -460,15 +591,56 @@ class Csc(Expression):
         assert isinstance(expression,Expression)
         self.expression = expression
     
+    @memoized
     def derivative(self):
         return simplify(Multiply(self.expression.derivative(), Multiply(Constant(-1),Multiply(self,Cot(self.expression)))))
     
     def compute(self, x):
         return 1 / math.sin(self.expression.compute(x))
     
+    def computeDerivative(self, x):
+        expression, dexpression = self.expression.computeDerivative(x)
+        csc = 1 / math.sin(expression)
+        return (csc, -dexpression * csc / math.tan(expression))
+    
     def __str__(self):
         return "(csc " + self.expression.__str__() + ")"
     
     def __eq__(self, other):
-        return isinstance(other,Csc) and self.expression == other.expression    
+        return isinstance(other,Csc) and self.expression == other.expression
+
+"""
+d/dx of an expression that is only built when it is needed.
+compute() goes through computeDerivative() and never builds the derivative tree,
+while __str__() and expand() build it once and keep it on the wrapped expression.
+Only the first order is lazy: computeDerivative() of a Derivative, and so
+compute() of Derivative(Derivative(f)), expands the first derivative tree and
+runs forward mode over it.
+"""
+class Derivative(Expression):
     
+    #param: expression = an Expression
+    def __init__(self,expression):
+        assert isinstance(expression,Expression)
+        self.expression = expression
+    
+    #return: the derivative as a regular Expression tree
+    def expand(self):
+        return self.expression.derivative()
+    
+    @memoized
+    def derivative(self):
+        return Derivative(self)
+    
+    def compute(self, x):
+        return self.expression.computeDerivative(x)[1]
+    
+    #builds the tree of the inner derivative, see above
+    def computeDerivative(self, x):
+        return (self.compute(x), self.expand().computeDerivative(x)[1])
+    
+    def __str__(self):
+        return self.expand().__str__()
+    
+    def __eq__(self, other):
+        return isinstance(other,Derivative) and self.expression == other.expression
@@ -1,10 +1,15 @@
-from Tkinter import *
+try:
+    from tkinter import *
+    from tkinter import messagebox as tkMessageBox
+except ImportError:
+    from Tkinter import *
+    import tkMessageBox
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib
 from matplotlib.figure import Figure
 from numpy import arange
-from ExpressionParser import *
-import tkMessageBox
+from .parser import *
+from .evaluator import evaluateGrid
 import webbrowser
 
 class Grapher:
@@ -43,6 +48,8 @@ class Grapher:
         self.canvas.show()
         self.canvas.get_tk_widget().pack(side=TOP)
         
+        self.parser = IncrementalParser('x')
+        
     def info(self):
         answer = tkMessageBox.askyesno("Info","Designed and created by Juliang Li\n Go check out his Github?\nhttps://github.com/Juliang0705")
         if answer:
@@ -51,13 +58,15 @@ class Grapher:
     def compute(self):
         input = self.input.get()
         try:
-            p = Parser(input,'x')
-            f = p.parse()
-            fprime = f.derivative()
-            self.outputText.set(str(fprime))
+            p = self.parser
+            f = p.update(input)
+            #the text needs the derivative tree, the parser only builds the nodes the edit changed
+            self.outputText.set(str(p.derivative()))
+            #the plot evaluates f' in forward mode, without that tree
+            fprime = Derivative(f)
             xs = arange(-25.0,25.0,0.5)
-            validXs,validYs = self.safeCompute(xs, f.compute)
-            validXPs,validYPs = self.safeCompute(xs,fprime.compute)
+            validXs,validYs = self.safeCompute(xs, f)
+            validXPs,validYPs = self.safeCompute(xs,fprime)
             self.plotBoard.clear()
             subplot = self.plotBoard.add_subplot(111)
             subplot.plot(validXs,validYs,label="f(x)")
@@ -68,15 +77,8 @@ class Grapher:
             tkMessageBox.showerror("Parsing Error","Remaining string: " + str(p) + "\nMake sure to use ( ) around functions\n e.g. [no]sin x [ok]sin(x)")            
             
     def safeCompute(self,xs,f):
-        validXs = []
-        validYs = []
-        for x in xs:
-            try:
-                validYs.append(f(x))
-                validXs.append(x)
-            except (ValueError,ZeroDivisionError):
-                pass
-        return (validXs,validYs)
+        ys,valid = evaluateGrid(f,xs[0],xs[-1],len(xs))
+        return (xs[valid],ys[valid])
             
 def center(win):
     win.update_idletasks()
@@ -0,0 +1,437 @@
+import bisect
+import re
+from .expression import *
+class TokenStream:
+    
+    def __init__(self,source,v):
+        self.source = re.sub(re.compile(r'\s+'), '',source)     
+        #index of the first character not consumed yet
+        self.position = 0
+        self.variable = v
+    
+    #the part of the source not consumed yet
+    @property
+    def stream(self):
+        return self.source[self.position:]
+        
+    def __str__(self):
+        return self.stream
+    
+    #get the first word in the stream
+    #return False if output doesn't match
+    def getWord(self,word):
+        if self.source.startswith(word,self.position):
+            self.position += len(word)
+            return word
+        else:
+            return False
+        
+    #get the first number in the stream
+    #return False if number cannot be parsed correctly    
+    def getNumber(self):
+        end = self.position
+        if end < len(self.source) and self.source[end] == '-':
+            end += 1
+        while end < len(self.source) and (self.source[end].isdigit() or self.source[end] == '.'):
+            end += 1
+        temp = self.source[self.position:end]
+        try:
+            if temp.find(".") != -1:
+                result = float(temp)
+            else:
+                result = int(temp)
+        except ValueError:
+            return False
+        self.position = end
+        return result
+    
+    def getOperator(self):
+        operators = "+-*/^"
+        for o in operators:
+            c = self.getWord(o)
+            if c :
+                return c
+        return False
+            
+    def getLeftParen(self):
+        return self.getWord("(")
+                 
+    def getRightParen(self):
+        return self.getWord(")")
+    
+    def getFunction(self):
+        functions = ["e^","ln","sin","cos","tan","sec","cot","csc"]
+        for f in functions:
+            result = self.getWord(f)
+            if result:
+                return result
+        return False        
+    
+    def getVariable(self):
+        return self.getWord(self.variable)
+    
+    def hasStream(self):
+        return self.position < len(self.source)
+"""
+order of precedence:
+-[1] parenthesis
+-[2] variable
+-[3] number literal
+-[4] functions
+-[5] power
+-[6] multiply/divide
+-[7] plus/minus
+"""
+class ParsingError(Exception):
+    pass
+class ParserError(Exception):
+    pass
+_whitespace = re.compile(r'\s')
+
+#the patterns only depend on the variable, so they are compiled once per variable
+_implicitMultiplication = {}
+
+#param: v = a character
+#return: a pattern that matches, with zero width, every place where a '*' is implied
+def implicitMultiplication(v):
+    if v not in _implicitMultiplication:
+        #(character before, text after) the '*', e.g. 2x -> 2*x, )( -> )*(, 2e^x -> 2*e^x
+        functions = [re.escape(f) for f in ["e^","ln","sin","cos","tan","sec","cot","csc"]]
+        pairs = [(r'\d',v), (v,r'\('), (r'\)',r'\('), (r'\d',r'\('), (r'\)',v)]
+        pairs += [(r'\d',f) for f in functions]
+        pairs += [(v,f) for f in functions]
+        pattern = '|'.join(['(?<=' + before + ')(?=' + after + ')' for before,after in pairs])
+        _implicitMultiplication[v] = re.compile(pattern)
+    return _implicitMultiplication[v]
+
+#param: source = a string, v = a character
+#return: source with the implicit '*' made explicit
+def insertMultiplication(source,v):
+    return implicitMultiplication(v).sub('*',source)
+
+class Parser:
+    
+    def __init__(self,source,v):
+        if not (isinstance(v,str) or len(v) == 1):
+            raise ParserError
+        self.ts = TokenStream(insertMultiplication(source,v), v)
+    
+    def __str__(self):
+        return str(self.ts)
+    def parse(self):
+        result = self.startParse()
+        if self.ts.hasStream():
+            raise ParsingError
+        else:
+            return result
+        
+    def startParse(self):
+        return self.parsePlusMinus()
+        
+    def parsePlusMinus(self):
+        return self.parsePlusMinusSeq(self.parseMultiplyDivide())
+    
+    def parsePlusMinusSeq(self,left):
+        if self.ts.getWord("+"):
+            right = self.parseMultiplyDivide()
+            return self.parsePlusMinusSeq(Plus(left,right))
+        elif self.ts.getWord("-"):
+            right = self.parseMultiplyDivide()
+            return self.parsePlusMinusSeq(Minus(left,right))
+        else:
+            return left
+        
+    def parseMultiplyDivide(self):
+        return self.parseMultiplyDivideSeq(self.parsePower()) 
+    
+    def parseMultiplyDivideSeq(self,left):
+        if self.ts.getWord("*"):
+            right = self.parsePower()
+            return self.parseMultiplyDivideSeq(Multiply(left,right))
+        elif self.ts.getWord("/"):
+            right = self.parsePower()
+            return self.parseMultiplyDivideSeq(Divide(left,right))
+        else:
+            return left
+        
+    def parsePower(self):
+        return self.parsePowerSeq(self.parseFunctions())
+    
+    def parsePowerSeq(self,left):
+        if self.ts.getWord("^"):
+            right = self.parseFunctions()
+            return self.parsePowerSeq(Power(left,right))
+        else:
+            return left
+    def parseFunctions(self):
+        f = self.ts.getFunction()
+        if f == "e^":
+            argument = self.parseVariable()
+            return E(argument)
+        elif f == "ln":
+            return Ln(self.parseParenthesis())
+
+        elif f == "sin":
+            return Sin(self.parseParenthesis())
+            
+        elif f == "cos":
+            return Cos(self.parseParenthesis())
+
+        elif f == "tan":
+            return Tan(self.parseParenthesis())
+
+        elif f == "sec":
+            return Sec(self.parseParenthesis())
+
+        elif f == "cot":
+            return Cot(self.parseParenthesis())
+            
+        elif f == "csc":
+            return Csc(self.parseParenthesis())
+        else:
+            return self.parseVariable()
+        
+    def parseVariable(self):
+        v = self.ts.getVariable()
+        if v:
+            return Variable(v)
+        else:
+            return self.parseConstant()
+        
+    def parseConstant(self):
+        n = self.ts.getNumber()
+        if n:
+            return Constant(n)
+        else:
+            return self.parseParenthesis()
+        
+    def parseParenthesis(self):
+        leftParen = self.ts.getLeftParen()
+        if leftParen:
+            v = self.startParse()
+            rightParen = self.ts.getRightParen()                
+            if rightParen:
+                return v
+            else:
+                raise ParsingError
+        else:
+            raise ParsingError
+
+#param: a, b = strings
+#return: (p, s), the lengths of their common prefix and suffix, with p + s <= min(len(a),len(b))
+def commonAffixes(a,b):
+    n = min(len(a),len(b))
+    #binary search on slice comparisons, which run in C
+    low, high = 0, n
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = low
+    low, high = 0, n - prefix
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return (prefix, low)
+
+"""
+Parser for a string that is edited over and over, e.g. one keystroke at a time.
+
+Only the edited span is normalized again: the places of the implicit '*' are
+kept from the previous string and rescanned just around the edit.
+
+Every chain a+b-c, a*b/c, a^b^c and every parenthesis group that gets parsed is
+remembered under the text it starts with, so it is found again wherever the
+edits moved it. A remembered parse is reused when the text it covers, plus the
+character that ended it, is the same at the current position; for a chain the
+longest such prefix of it is reused. Reused subtrees are the very same
+Expression objects, so they keep their memoized derivatives, and
+differentiation only visits the new nodes.
+"""
+class IncrementalParser(Parser):
+    
+    #how many characters of text a remembered parse is looked up by
+    WINDOW = 32
+    #remembered parses are dropped and rebuilt by a full parse once the old strings
+    #they keep alive could add up to this many characters
+    COMPACT_CHARS = 1 << 22
+    
+    def __init__(self,v):
+        Parser.__init__(self,"",v)
+        self.variable = v
+        #the last successfully parsed normalized string and its Expression
+        self.source = None
+        self.tree = None
+        self.__raw = None
+        #sorted indices in __raw of the whitespace, and of the characters a '*' goes before
+        self.__spaces = []
+        self.__stars = []
+        self.__normalized = ""
+        #(level, first WINDOW characters) -> (source, start, ends, nodes), ends are relative to start
+        self.__parses = {}
+        self.__retained = 0
+    
+    #param: source = the whole string after the edit
+    #return: an Expression
+    def update(self,source):
+        normalized = self.__normalize(source)
+        if normalized == self.source:
+            return self.tree
+        #already free of whitespace
+        self.ts = TokenStream("", self.variable)
+        self.ts.source = normalized
+        self.__retained += len(normalized)
+        if self.__retained > self.COMPACT_CHARS:
+            self.__parses = {}
+            self.__retained = len(normalized)
+        tree = self.parse()
+        self.source = normalized
+        self.tree = tree
+        return tree
+    
+    #return: the derivative of the last successfully parsed Expression
+    #raise ParsingError if no update() has parsed yet
+    def derivative(self):
+        if self.tree is None:
+            raise ParsingError
+        return self.tree.derivative()
+    
+    #return: the normalized form of raw, with '*' and whitespace only searched for around the edit
+    def __normalize(self,raw):
+        pattern = implicitMultiplication(self.variable)
+        if self.__raw is None:
+            self.__raw = raw
+            self.__spaces = [m.start() for m in _whitespace.finditer(raw)]
+            self.__stars = [m.start() for m in pattern.finditer(raw)]
+            self.__normalized = _whitespace.sub('', pattern.sub('*', raw))
+            return self.__normalized
+        old = self.__raw
+        prefix, suffix = commonAffixes(old, raw)
+        delta = len(raw) - len(old)
+        #a '*' before raw[j] depends on raw[j-1:j+3], so only j in [low, high] can change
+        low = max(0, prefix - 2)
+        oldHigh = len(old) - suffix
+        high = oldHigh + delta
+        #old text before low and from right on is unchanged, so is its normalized form
+        right = min(len(old), oldHigh + 1)
+        left = self.__normalized[:self.__normalizedLength(low)]
+        rest = self.__normalized[self.__normalizedLength(right):]
+        stars = [m.start() for m in pattern.finditer(raw, low, min(len(raw), high + 4)) if m.start() <= high]
+        spaces = [m.start() for m in _whitespace.finditer(raw, low, right + delta)]
+        pieces = []
+        last = low
+        for j in stars:
+            pieces.append(raw[last:j])
+            pieces.append('*')
+            last = j
+        pieces.append(raw[last:right + delta])
+        normalized = left + _whitespace.sub('', "".join(pieces)) + rest
+        self.__stars = (self.__stars[:bisect.bisect_left(self.__stars, low)] + stars
+                        + [j + delta for j in self.__stars[bisect.bisect_right(self.__stars, oldHigh):]])
+        self.__spaces = (self.__spaces[:bisect.bisect_left(self.__spaces, low)] + spaces
+                         + [j + delta for j in self.__spaces[bisect.bisect_left(self.__spaces, right):]])
+        self.__raw = raw
+        self.__normalized = normalized
+        return normalized
+    
+    #return: the length of the normalized form of __raw[:r]
+    def __normalizedLength(self,r):
+        return r - bisect.bisect_left(self.__spaces, r) + bisect.bisect_left(self.__stars, r)
+    
+    #return: whether the parse remembered in entry, up to its end-th character, holds at start
+    def __holds(self,entry,start,end):
+        source, oldStart = entry[0], entry[1]
+        current = self.ts.source
+        if oldStart + end == len(source):
+            return start + end == len(current) and current[start:] == source[oldStart:]
+        #the character that ended the parse has to be the same too
+        return current[start:start + end + 1] == source[oldStart:oldStart + end + 1]
+    
+    #return: how many leading elements of the chain in entry still hold at start
+    def __holding(self,entry,start):
+        ends = entry[2]
+        if self.__holds(entry, start, ends[-1]):
+            return len(ends)
+        low, high = 0, len(ends) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.__holds(entry, start, ends[middle - 1]):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+    
+    #return: (ends, nodes) of the longest remembered parse that holds at the current position
+    def __reuse(self,level):
+        start = self.ts.position
+        entry = self.__parses.get((level, self.ts.source[start:start + self.WINDOW]))
+        if entry:
+            k = self.__holding(entry, start)
+            return (entry[2][:k], entry[3][:k])
+        return ([], [])
+    
+    def __record(self,level,start,ends,nodes):
+        source = self.ts.source
+        self.__parses[(level, source[start:start + self.WINDOW])] = (source, start, ends, nodes)
+    
+    #parse a left associative chain, continuing the longest remembered prefix of it
+    def __chain(self,level,operand,operators):
+        start = self.ts.position
+        ends, nodes = self.__reuse(level)
+        if nodes:
+            left = nodes[-1]
+            self.ts.position = start + ends[-1]
+        else:
+            left = operand()
+            ends.append(self.ts.position - start)
+            nodes.append(left)
+        while (True):
+            for word, cls in operators:
+                if self.ts.getWord(word):
+                    left = cls(left, operand())
+                    ends.append(self.ts.position - start)
+                    nodes.append(left)
+                    break
+            else:
+                break
+        self.__record(level, start, ends, nodes)
+        return left
+    
+    def parsePlusMinus(self):
+        return self.__chain("sum", self.parseMultiplyDivide, (("+", Plus), ("-", Minus)))
+    
+    def parseMultiplyDivide(self):
+        return self.__chain("product", self.parsePower, (("*", Multiply), ("/", Divide)))
+    
+    def parsePower(self):
+        return self.__chain("power", self.parseFunctions, (("^", Power),))
+    
+    def parseParenthesis(self):
+        start = self.ts.position
+        ends, nodes = self.__reuse("group")
+        if nodes:
+            self.ts.position = start + ends[-1]
+            return nodes[-1]
+        tree = Parser.parseParenthesis(self)
+        self.__record("group", start, [self.ts.position - start], [tree])
+        return tree
+
+def main():
+    try:
+        while (True):
+            userInput = input("f(x)=")
+            p = Parser(userInput,'x')
+            result = p.parse().derivative()
+            print("f'(x)=", result)
+    except (ParsingError,ParserError):
+        print("Parsing Error")
+
+if __name__ == "__main__":
+    main()
+
+    
\ No newline at end of file
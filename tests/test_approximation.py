@@ -0,0 +1,86 @@
+import math
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+from symbolicdifferentiator.approximation import ChebyshevSurrogate, ApproximationError, surrogate, clearCache
+try:
+    import numpy
+except ImportError:
+    numpy = None
+"""
+Checks of the piecewise Chebyshev surrogates and their cache
+
+    python -m pytest tests
+"""
+SOURCES = ["sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "x^3-4x^2+2x-7", "tan(x)*cos(2x)+sec(x/5)", "(x-5)^3"]
+
+#gives a number at the interpolation nodes and nan at the points checked between them
+class NanBetweenNodes(Expression):
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.calls = 0
+
+    def derivative(self):
+        return Constant(0)
+
+    def compute(self, x):
+        self.calls += 1
+        return 1.0 if self.calls <= self.nodes else float("nan")
+
+    def __str__(self):
+        return "nan"
+
+    def __eq__(self, other):
+        return self is other
+
+class SurrogateTest(unittest.TestCase):
+
+    def setUp(self):
+        clearCache()
+
+    def testErrorWithinTolerance(self):
+        for source in SOURCES:
+            f = Parser(source, 'x').parse()
+            for tolerance in (1e-6, 1e-10):
+                s = surrogate(f, -1.0, 1.5, tolerance)
+                self.assertLessEqual(s.errorBound, tolerance)
+                for i in range(0, 301):
+                    x = -1.0 + 2.5 * i / 300
+                    self.assertLessEqual(abs(s.compute(x) - f.compute(x)), 2 * tolerance, (source, x))
+
+    def testCacheReturnsSameObject(self):
+        f = Parser("sin(x)*x", 'x').parse()
+        s = surrogate(f, 0, 1)
+        self.assertIs(surrogate(Parser("sin(x)*x", 'x').parse(), 0.0, 1.0), s)
+        self.assertIsNot(surrogate(f, 0, 1, 1e-6), s)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def testArrayMatchesScalars(self):
+        s = surrogate(Parser("sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", 'x').parse(), -1.0, 2.0)
+        xs = numpy.linspace(-1.0, 2.0, 257)
+        ys = s.compute(xs)
+        for x, y in zip(xs, ys):
+            self.assertEqual(y, s.compute(float(x)))
+
+    def testPoleRaises(self):
+        self.assertRaises(ApproximationError, surrogate, Parser("tan(x)", 'x').parse(), 0.0, 3.0)
+
+    def testNanBetweenNodesRaises(self):
+        self.assertRaises(ApproximationError, ChebyshevSurrogate, NanBetweenNodes(17), 0.0, 1.0)
+
+    def testOutsideIntervalRaises(self):
+        s = surrogate(Parser("x^2", 'x').parse(), 0.0, 1.0)
+        self.assertRaises(ValueError, s.compute, 1.5)
+
+    def testDerivativeUsesForwardMode(self):
+        #the symbolic derivative of (x-5)^3 takes ln(x-5), which is undefined on [0,1]
+        f = Parser("(x-5)^3", 'x').parse()
+        d = surrogate(f, 0.0, 1.0).derivative()
+        self.assertLessEqual(d.errorBound, 1e-10)
+        self.assertTrue(math.fabs(d.compute(0.0) - 75.0) < 1e-9)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+from symbolicdifferentiator.cache import ExpressionCache
+"""
+Checks of the on-disk expression cache
+
+    python -m pytest tests
+"""
+SOURCES = ["x^3-4x^2+2x-7", "sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "tan(x)*cos(2x)+sec(x/5)",
+           "(x-5)^3", "x^x", "2^x*csc(x)", "cot(x)/(x+1)^2", "3sin(x)*cos(x)"]
+
+class ExpressionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ExpressionCache(os.path.join(self.directory, "cache.db"), maxEntries=3)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def testRoundTrip(self):
+        for source in SOURCES:
+            f = Parser(source, 'x').parse()
+            self.cache.put(source, 'x', f, f.derivative())
+            expression, derivative = ExpressionCache(self.cache.path).get(source, 'x')
+            self.assertEqual(str(expression), str(f))
+            self.assertEqual(str(derivative), str(f.derivative()))
+
+    def testNormalizedKeyAndEviction(self):
+        expression, derivative = self.cache.parse("2x+sin(x)", 'x')
+        self.assertEqual(str(self.cache.get("2 * x + sin( x )", 'x')[1]), str(derivative))
+        self.assertIsNone(self.cache.get("2x+sin(x)", 'y'))
+        for i in range(2, 7):
+            self.cache.parse("x^%d" % i, 'x')
+        self.assertEqual(len(self.cache), 3)
+
+    def testFailedPutLeavesNoEntry(self):
+        self.assertRaises(ValueError, self.cache.put, "x", 'x', object(), object())
+        self.assertEqual(len(self.cache), 0)
+
+    def testReplaceKeepsCount(self):
+        f = Parser("x^2", 'x').parse()
+        for i in range(0, 5):
+            self.cache.put("x^2", 'x', f, f.derivative())
+        self.assertEqual(len(self.cache), 1)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def testCountsFileWithoutSizeTable(self):
+        self.cache.parse("x^2", 'x')
+        self.cache.parse("x^3", 'x')
+        self.cache.close()
+        connection = sqlite3.connect(self.cache.path)
+        connection.execute("DROP TABLE size")
+        connection.commit()
+        connection.close()
+        self.assertEqual(len(self.cache), 2)
+
+    def testContextManagerCloses(self):
+        with ExpressionCache(self.cache.path) as cache:
+            cache.parse("sin(x)", 'x')
+        self.assertEqual(str(cache.get("sin(x)", 'x')[1]), "(cos x)")
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+from symbolicdifferentiator.evaluator import DTYPES, Evaluator, evaluate, evaluateGrid
+try:
+    import numpy
+except ImportError:
+    numpy = None
+"""
+Checks of evaluation in the selectable dtypes and on grids
+
+    python -m pytest tests
+"""
+SOURCES = ["x^3-4x^2+2x-7", "sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "tan(x)*cos(2x)+sec(x/5)",
+           "(x-5)^3", "x^x", "2^x*csc(x)", "cot(x)/(x+1)^2", "3sin(x)*cos(x)"]
+POINTS = [-2.5, -0.7, 0.3, 1.1, 2.7, 6.2]
+
+#return: the value of f at x, or None where compute() raises
+def computeOrNone(f, x):
+    try:
+        return f.compute(x)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return None
+
+class ScalarEvaluatorTest(unittest.TestCase):
+
+    def testFloatMatchesCompute(self):
+        for source in SOURCES:
+            f = Parser(source, 'x').parse()
+            for expr in (f, Derivative(f)):
+                for x in POINTS:
+                    expected = computeOrNone(expr, x)
+                    if expected is not None:
+                        self.assertEqual(evaluate(expr, x), expected, (source, x))
+
+    def testDerivativeMatchesCompute(self):
+        #the symbolic derivative takes ln(x-5), the evaluator follows compute() in forward mode
+        f = Parser("(x-5)^3", 'x').parse()
+        self.assertEqual(evaluate(Derivative(f), 0.0), 75.0)
+        self.assertEqual(evaluate(Derivative(f), 0.0, "complex128"), 75.0)
+
+    def testComplexDefinesLogOfNegatives(self):
+        self.assertRaises(ValueError, evaluate, Parser("ln(x)", 'x').parse(), -1.0)
+        self.assertEqual(evaluate(Parser("ln(x)", 'x').parse(), -1.0, "complex"), complex(0.0, math.pi))
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class ArrayEvaluatorTest(unittest.TestCase):
+
+    def testDtypesMatchCompute(self):
+        xs = numpy.array(POINTS)
+        for source in SOURCES:
+            f = Parser(source, 'x').parse()
+            for expr in (f, Derivative(f)):
+                for dtype in DTYPES:
+                    ys = evaluate(expr, xs, dtype)
+                    self.assertEqual(ys.dtype, numpy.dtype(dtype))
+                    tolerance = 1e-3 if dtype in ("float32", "complex64") else 1e-9
+                    for x, y in zip(POINTS, ys):
+                        expected = computeOrNone(expr, x)
+                        if expected is not None:
+                            self.assertLessEqual(abs(y - expected), tolerance * max(1.0, abs(expected)),
+                                                 (source, dtype, x))
+
+    def testDerivativeHasNoNan(self):
+        ys = evaluate(Derivative(Parser("(x-5)^3", 'x').parse()), numpy.array([0.0, 1.0, 6.0]))
+        self.assertEqual(ys.tolist(), [75.0, 48.0, 3.0])
+
+    def testConstantFillsShape(self):
+        ys = evaluate(Parser("2+3", 'x').parse(), numpy.zeros(4), "float32")
+        self.assertEqual(ys.shape, (4,))
+        self.assertEqual(ys.dtype, numpy.float32)
+
+    def testRejectsIntegerDtype(self):
+        self.assertRaises(ValueError, Evaluator, "int32")
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class EvaluateGridTest(unittest.TestCase):
+
+    def testGridMask(self):
+        f = Parser("ln(x)", 'x').parse()
+        ys, mask = evaluateGrid(f, -1.0, 1.0, 201, chunk=16, workers=4)
+        xs = numpy.linspace(-1.0, 1.0, 201)
+        self.assertTrue(numpy.array_equal(mask, xs > 0))
+        self.assertTrue(numpy.allclose(ys[mask], numpy.log(xs[mask])))
+        ys, mask = evaluateGrid(Derivative(Parser("(x-5)^3", 'x').parse()), -10.0, 10.0, 101)
+        self.assertTrue(mask.all())
+
+    def testGridRejectsWrongDtypes(self):
+        f = Parser("x^2", 'x').parse()
+        self.assertRaises(ValueError, evaluateGrid, f, 0.0, 1.0, 5, out=numpy.empty(5, dtype="float32"))
+        self.assertRaises(ValueError, evaluateGrid, f, 0.0, 1.0, 5, mask=numpy.empty(5, dtype="int8"))
+
+    def testGridToFile(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "grid.npy")
+            evaluateGrid(Parser("x^2", 'x').parse(), 0.0, 1.0, 5, out=path)
+            self.assertTrue(numpy.allclose(numpy.load(path), numpy.linspace(0.0, 1.0, 5) ** 2))
+        finally:
+            shutil.rmtree(directory)
+
+    def testGridRejectsWrongLengths(self):
+        f = Parser("x^2", 'x').parse()
+        self.assertRaises(ValueError, evaluateGrid, f, 0.0, 1.0, 5, out=numpy.empty(4))
+        self.assertRaises(ValueError, evaluateGrid, f, 0.0, 1.0, 5, mask=numpy.empty(6, dtype=bool))
+
+    def testGridWithDtypeObject(self):
+        f = Parser("x^2", 'x').parse()
+        ys, mask = evaluateGrid(f, 0.0, 1.0, 5, dtype=numpy.longdouble)
+        self.assertEqual(ys.dtype, numpy.longdouble)
+        self.assertRaises(ValueError, evaluateGrid, f, 0.0, 1.0, 5, dtype=numpy.longdouble, out=numpy.empty(5))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+"""
+Checks of the expression tree: simplification and derivatives
+
+    python -m pytest tests
+"""
+SOURCES = ["x^3-4x^2+2x-7", "sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "tan(x)*cos(2x)+sec(x/5)",
+           "(x-5)^3", "x^x", "2^x*csc(x)", "cot(x)/(x+1)^2", "3sin(x)*cos(x)"]
+POINTS = [-2.5, -0.7, 0.3, 1.1, 2.7, 6.2]
+
+def close(a, b):
+    return abs(a - b) <= 1e-9 * max(1.0, abs(b))
+
+#return: the value of f at x, or None where compute() raises
+def computeOrNone(f, x):
+    try:
+        return f.compute(x)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return None
+
+class SimplifyTest(unittest.TestCase):
+
+    def testNegationIsSimplified(self):
+        #0-1 used to print as (-1*1) when it was the whole result and -1 inside a larger tree
+        self.assertEqual(str(Parser("1/x", 'x').parse().derivative()), "(-1/(x*x))")
+        self.assertEqual(str(Parser("3.5-x", 'x').parse().derivative()), "-1")
+        self.assertEqual(str(simplify(Minus(Constant(0), Multiply(Constant(1), Variable('x'))))), "(-1*x)")
+
+    def testSimplifiedTreesAreMarked(self):
+        f = Parser("x^2+sin(x)", 'x').parse()
+        g = simplify(f)
+        self.assertIs(g, f)
+        self.assertTrue(g.simplified)
+        self.assertIs(simplify(g), g)
+        d = f.derivative()
+        self.assertIs(f.derivative(), d)
+        self.assertTrue(d.simplified)
+
+class DerivativeTest(unittest.TestCase):
+
+    def testComputeMatchesSymbolicDerivative(self):
+        for source in SOURCES:
+            f = Parser(source, 'x').parse()
+            for x in POINTS:
+                expected = computeOrNone(f.derivative(), x)
+                if expected is not None:
+                    self.assertTrue(close(Derivative(f).compute(x), expected), (source, x))
+                expected = computeOrNone(f.derivative().derivative(), x)
+                if expected is not None:
+                    self.assertTrue(close(Derivative(Derivative(f)).compute(x), expected), (source, x))
+
+    def testForwardModeWhereSymbolicRaises(self):
+        #the symbolic derivative takes ln(x-5), forward mode uses the power rule
+        f = Parser("(x-5)^3", 'x').parse()
+        self.assertEqual(Derivative(f).compute(0.0), 75.0)
+        self.assertRaises(ValueError, f.derivative().compute, 0.0)
+
+    def testFirstOrderIsLazy(self):
+        f = Parser("sin(x)*x^3", 'x').parse()
+        Derivative(f).compute(1.0)
+        self.assertFalse(hasattr(f, "_derivative"))
+        #the second order expands the first derivative, as documented
+        Derivative(Derivative(f)).compute(1.0)
+        self.assertTrue(hasattr(f, "_derivative"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+"""
+Checks of the lazy package import.
+
+    python -m pytest tests
+"""
+
+class PackageTest(unittest.TestCase):
+
+    def testImportLoadsNoNumpy(self):
+        code = ("import sys, symbolicdifferentiator as s\n"
+                "s.Parser('x^2+sin(x)', 'x').parse().derivative()\n"
+                "print(sorted(m for m in ('numpy', 'sqlite3', 'tkinter', 'matplotlib') if m in sys.modules))\n")
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=root, universal_newlines=True)
+        self.assertEqual(output.strip(), "[]")
+
+    def testLazyNames(self):
+        import symbolicdifferentiator
+        from symbolicdifferentiator.cache import ExpressionCache
+        self.assertIn("ExpressionCache", dir(symbolicdifferentiator))
+        self.assertIs(symbolicdifferentiator.ExpressionCache, ExpressionCache)
+        self.assertRaises(AttributeError, getattr, symbolicdifferentiator, "missing")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+import unittest
+import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from symbolicdifferentiator import *
+from symbolicdifferentiator.parser import implicitMultiplication
+"""
+Checks of the implicit '*' and of the incremental parser
+
+    python -m pytest tests
+"""
+SOURCES = ["x^3-4x^2+2x-7", "sin(x)*e^(x/3)+ln(x^2+1)/(x+2)", "tan(x)*cos(2x)+sec(x/5)",
+           "(x-5)^3", "x^x", "2^x*csc(x)", "cot(x)/(x+1)^2", "3sin(x)*cos(x)"]
+
+#a long input of groups of terms, the groups keep the parser's recursion shallow
+def longSource(groups, perGroup=20):
+    terms = ["sin(%dx)*x^2" % (i % 7 + 1) if i % 3 else "ln(x+%d)/x" % (i + 1) for i in range(groups * perGroup)]
+    return "+".join("(" + "+".join(terms[g * perGroup:(g + 1) * perGroup]) + ")" for g in range(groups))
+
+#return: how many nodes of expr have no memoized derivative yet, i.e. what derivative() will visit
+def undifferentiated(expr):
+    if hasattr(expr, "_derivative"):
+        return 0
+    children = [getattr(expr, name) for name in ("left", "right", "base", "exponent", "argument", "expression")
+                if isinstance(getattr(expr, name, None), Expression)]
+    return 1 + sum(undifferentiated(child) for child in children)
+
+#counts the operands it parses, the ones a remembered parse did not cover
+class CountingParser(IncrementalParser):
+
+    def __init__(self, v):
+        IncrementalParser.__init__(self, v)
+        self.operands = 0
+
+    def parseFunctions(self):
+        self.operands += 1
+        return IncrementalParser.parseFunctions(self)
+
+class InsertMultiplicationTest(unittest.TestCase):
+
+    def testImplicitProducts(self):
+        self.assertEqual(insertMultiplication("2x+x(x+1)(x-1)", 'x'), "2*x+x*(x+1)*(x-1)")
+        self.assertEqual(insertMultiplication("3sin(x)+xln(x)+(x)x", 'x'), "3*sin(x)+x*ln(x)+(x)*x")
+        self.assertEqual(insertMultiplication("2e^x+xe^x", 'x'), "2*e^x+x*e^x")
+        self.assertEqual(str(Parser("2e^x", 'x').parse()), "(2*(e^x))")
+
+    def testPatternCompilesWithoutWarnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            implicitMultiplication('t')
+
+class IncrementalParserTest(unittest.TestCase):
+
+    #return: (tree, derivative) as strings, or None when the input does not parse
+    def fullParse(self, source):
+        try:
+            f = Parser(source, 'x').parse()
+        except ParsingError:
+            return None
+        return (str(f), str(f.derivative()))
+
+    def testEditsMatchFullParse(self):
+        random.seed(0)
+        pieces = ["x", "2", "3.5", "(", ")", "+", "-", "*", "/", "^", " ", "sin(x)", "e^(x)", "ln(x)", "(x+1)", "3x"]
+        for trial in range(50):
+            parser = IncrementalParser('x')
+            source = random.choice(SOURCES)
+            for step in range(30):
+                i = random.randint(0, len(source))
+                if random.random() < 0.3 and source:
+                    source = source[:i] + source[i + 1:]
+                else:
+                    source = source[:i] + random.choice(pieces) + source[i:]
+                try:
+                    tree = parser.update(source)
+                    result = (str(tree), str(parser.derivative()))
+                except ParsingError:
+                    result = None
+                self.assertEqual(result, self.fullParse(source), source)
+
+    #return: (operands parsed, nodes differentiated) by each edit of edits after a full parse of source
+    def editCost(self, source, edits):
+        parser = CountingParser('x')
+        parser.update(source)
+        parser.derivative()
+        costs = []
+        for edited in edits:
+            parser.operands = 0
+            tree = parser.update(edited)
+            nodes = undifferentiated(tree)
+            parser.derivative()
+            costs.append((parser.operands, nodes))
+        return costs
+
+    def testAppendIsConstantWork(self):
+        small = longSource(5) + "+1"
+        large = longSource(40) + "+1"
+        #linear work would be 8 times more on the large input
+        self.assertEqual(self.editCost(small, [small + "1", small + "11"]),
+                         self.editCost(large, [large + "1", large + "11"]))
+
+    def testMiddleEditOnlyRebuildsItsChains(self):
+        source = longSource(40)
+        middle = source.index("+", len(source) // 2) + 1
+        operands, nodes = self.editCost(source, [source[:middle] + "2" + source[middle:]])[0]
+        #the edited term and the rest of its group's and of the top level's chains, out of thousands of nodes
+        self.assertLessEqual(operands, 20)
+        self.assertLessEqual(nodes, 40 + 20 + 10)
+        self.assertGreater(undifferentiated(Parser(source, 'x').parse()), 2000)
+
+    def testDerivativeBeforeParseRaises(self):
+        parser = IncrementalParser('x')
+        self.assertRaises(ParsingError, parser.derivative)
+        self.assertRaises(ParsingError, parser.update, "x+")
+        self.assertRaises(ParsingError, parser.derivative)
+
+if __name__ == "__main__":
+    unittest.main()